@@ -3,23 +3,50 @@ import sys
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
-from src.config import Config, BASE_PAHT
-from rich.console import Console
-from rich.text import Text
-import pyfiglet
+import time
 import click
-import subprocess
 
-console = Console()
-msg = pyfiglet.figlet_format('My Conf FastAPI')
+# rich, pyfiglet, subprocess y src.config se importan bajo demanda: `--help` y los
+# scripts de aprovisionamiento no deben pagar su coste de arranque.
 version = '1.0.0'
 
-config = Config(BASE_PAHT, 'default_project_name')
+_config = None
+
+def get_config():
+    global _config
+    if _config is None:
+        from src.config import Config, ConfigError, BASE_PAHT
+        config = Config(BASE_PAHT, 'default_project_name')
+        try:
+            config.load_data()
+        except ConfigError as e:
+            # Ningún comando sigue con una configuración que no se pudo leer
+            raise click.ClickException(f'{e}. Corrija o elimine el archivo.')
+        _config = config
+    return _config
+
+def print_error(message:str):
+    from src.config import print_error
+    print_error(message, style="bold red")
+
+def print_version(ctx, param, value):
+    if not value or ctx.resilient_parsing:
+        return
+    import pyfiglet
+    click.echo(pyfiglet.figlet_format('My Conf FastAPI'))
+    click.echo(f'Versión {version}')
+    ctx.exit()
 
 @click.group()
-@click.version_option(version=version, message=f"{msg}", show_choices=True)
-def main():
-    pass
+@click.option('--version', is_flag=True, expose_value=False, is_eager=True, callback=print_version, help='Mostrar la versión y salir.')
+@click.pass_context
+def main(ctx):
+    # Una sola escritura de config.json al terminar el comando
+    ctx.call_on_close(save_config)
+
+def save_config():
+    if _config is not None:
+        _config.save_data()
 
 @main.command()
 @click.option('--path', '-p', type=str, required=False, help='Ruta del proyecto')
@@ -27,10 +54,16 @@ def main():
 @click.option('--preact', '-pr', is_flag=True, help='Instalar preact')
 @click.option('--uvicorn', '-u', is_flag=True, help='Instalar uvicorn')
 @click.option('--gunicorn', '-g', is_flag=True, help='Instalar gunicorn')
-@click.option('--only-api', '-o', is_flag=True, help='Solo instalar api')
-def set_config(path, name, preact, uvicorn, gunicorn) -> None:
-    npm_version = subprocess.run(['npm','--version'], capture_output=True, text=True)
-    if npm_version:
+@click.option('--only-api/--no-only-api', '-o', default=None, help='Solo instalar api')
+@click.option('--db', type=click.Choice(['sync', 'async', 'postgres']), required=False, help='Capa de base de datos: sync (SQLite), async (aiosqlite) o postgres (asyncpg)')
+@click.option('--cache/--no-cache', default=None, help='Generar la capa de caché de respuestas (TTL/LRU, ETag, Redis)')
+@click.option('--refresh', is_flag=True, help='Ignorar la caché y volver a comprobar npm, python y virtualenv')
+def set_config(path, name, preact, uvicorn, gunicorn, only_api, db, cache, refresh) -> None:
+    from src.config import get_console
+    from src.probe import probe
+    config = get_config()
+    tools = probe(use_cache=not refresh)
+    if tools['npm']:
         if preact:
             config.set_preact(preact)
         if uvicorn:
@@ -38,46 +71,241 @@ def set_config(path, name, preact, uvicorn, gunicorn) -> None:
         if gunicorn:
             config.set_gunicorn(gunicorn)
     else:
-        error_text = Text('Npm no está instalado o no es la versión correcta.', style="bold red")
-        console.print(error_text)
+        print_error('Npm no está instalado o no es la versión correcta.')
 
-    python_version = subprocess.run(['python','--version'], capture_output=True, text=True)
-    if python_version:
+    if tools['python']:
         config.set_path(path)
         config.set_name(name)
-        if config.only_api:
-            config.set_api(True)
-        else:
-            config.set_api(False)
+        if only_api is not None:
+            config.set_api(only_api)
+        if db:
+            config.set_db(db)
+        if cache is not None:
+            config.set_cache(cache)
         config.print_table()
-        config.save_data()  # Guardar los cambios
-        resultado_venv = subprocess.run(['pip', 'list'], capture_output=True, text=True)
-        if 'virtualenv' in resultado_venv.stdout:
-            console.print("Virtualenv está instalado.")
+        if tools['virtualenv']:
+            get_console().print("Virtualenv está instalado.")
         else:
-            error_text = Text("Virtualenv no está instalado.", style="bold red")
-            console.print(error_text)
+            print_error("Virtualenv no está instalado.")
     else:
-        error_text = Text('Python no está instalado o no es la versión correcta.', style="bold red")
-        console.print(error_text)
+        print_error('Python no está instalado o no es la versión correcta.')
 
 @main.command()
 def reset_config():
+    config = get_config()
     config.set_path('')
     config.set_name('')
     config.set_preact(False)
     config.set_uvicorn(True)
     config.set_gunicorn(False)
-    config.save_data()
+    config.set_db('sync')
+    config.set_cache(False)
 
 @main.command()
 def view_config():
-    config.print_table()
+    get_config().print_table()
+
+@main.command()
+@click.option('--venv-template', is_flag=True, help='Clonar el .venv desde una plantilla en caché con las dependencias ya instaladas')
+@click.option('--wheelhouse', type=click.Path(file_okay=False), envvar='MCF_WHEELHOUSE', required=False, help='Instalar dependencias sin red desde este directorio de wheels')
+@click.option('--update', is_flag=True, help='Reescribir los archivos cuya plantilla cambió y que no fueron editados')
+@click.option('--output', type=click.Choice(['fs', 'memory', 'tar', 'zip']), default='fs', show_default=True, help='Destino: disco, memoria (dry run) o un tar.gz/zip escrito en stdout')
+def build_config(venv_template, wheelhouse, update, output):
+    from src.config import get_console
+    from src.output import open_output
+    config = get_config()
+    config.load_data()
+    stream = None
+    if output in ('tar', 'zip'):
+        if sys.stdout.isatty():
+            print_error(f'Redirija la salida a un archivo: build-config --output {output} > proyecto.{"tar.gz" if output == "tar" else output}')
+            sys.exit(1)
+        # stdout queda reservado al archivo; los mensajes van a stderr
+        get_console().stderr = True
+        stream = sys.stdout.buffer
+    backend = open_output(output, f'{config.path_parent}/{config.project_name}', stream)
+    try:
+        result = config.build_config(venv_template=venv_template, wheelhouse=wheelhouse, incremental=update, output=backend)
+    finally:
+        backend.close()
+    if result['report']:
+        print_report(result['report'])
+    print_timings(result['timings'])
+    if output == 'memory':
+        get_console().print('[yellow]Dry run:[/yellow] nada escrito en disco')
+    if result['errors']:
+        sys.exit(1)
+
+def print_report(report:dict):
+    from src.config import get_console
+    console = get_console()
+    for path in report['updated']:
+        console.print(f'[green]actualizado[/green] {path}')
+    for path in report['conflict']:
+        print_error(f'conflicto: {path} fue modificado; no se sobrescribe')
+    for path in report['removed']:
+        console.print(f'[yellow]eliminado[/yellow] {path} (la configuración ya no lo genera)')
+    for path in report['orphaned']:
+        console.print(f'[yellow]huérfano[/yellow] {path}: la configuración ya no lo genera; revíselo o bórrelo')
+    console.print(', '.join(f'{len(paths)} {status}' for status, paths in report.items()))
+
+def print_timings(timings:dict):
+    from rich.table import Table
+    from src.config import get_console
+    table = Table(title="Tiempos")
+    table.add_column("Fase", justify="left", style="cyan")
+    table.add_column("Tiempo", justify="right", style="magenta")
+    for key in ('render', 'venv', 'deps', 'dirs', 'files', 'frontend', 'total'):
+        if key in timings:
+            table.add_row(key, f'{timings[key] * 1000:.1f} ms')
+    get_console().print(table)
+
+@main.command()
+def migrate():
+    from src.build import migrate_project
+    config = get_config()
+    config.load_data()
+    package = 'app.backend' if config.preact else 'app'
+    if migrate_project(f'{config.path_parent}/{config.project_name}', package) != 0:
+        print_error('La migración del esquema falló.')
+
+@main.command()
+@click.option('--offline', is_flag=True, help='Usar solo las librerías ya descargadas en la caché')
+def build_assets(offline):
+    from rich.table import Table
+    from src.config import get_console
+    from src.assets import build_assets, precompress
+    from src.scaffold import FRONTEND_DIR
+    config = get_config()
+    config.load_data()
+    root = f'{config.path_parent}/{config.project_name}'
+    if config.only_api and not config.preact:
+        print_error('El proyecto es solo API: no tiene estáticos.')
+        sys.exit(1)
+    try:
+        if config.preact:
+            dist = f'{root}/{FRONTEND_DIR}/dist'
+            if not os.path.isdir(dist):
+                print_error('El frontend no está compilado: ejecute build-config o npm run build en app/frontend.')
+                sys.exit(1)
+            # dist/ ya sale de Vite con hashes: solo faltan las variantes comprimidas
+            result = precompress(dist)
+        else:
+            result = build_assets(f'{root}/app/static', offline=offline)
+    except OSError as e:
+        print_error(f'No se pudieron descargar las librerías: {e}')
+        sys.exit(1)
+    table = Table(title="build-assets")
+    table.add_column("Archivo", justify="left", style="cyan")
+    for column in ('Original', 'gzip', 'brotli'):
+        table.add_column(column, justify="right", style="magenta")
+    for name, data in result['files'].items():
+        table.add_row(data['path'], *(f"{data[key] / 1024:.1f} KiB" if data[key] else '-' for key in ('raw', 'gz', 'br')))
+    console = get_console()
+    console.print(table)
+    if not result['brotli']:
+        console.print('[yellow]Sin el paquete brotli no se generan variantes .br (pip install brotli)[/yellow]')
+
+def check_profile(root:str, profile:str):
+    if profile == 'gunicorn' and not os.path.exists(f'{root}/gunicorn.conf.py'):
+        print_error('El proyecto no tiene gunicorn.conf.py: ejecute set-config --gunicorn y build-config --update.')
+        sys.exit(1)
+
+@main.command()
+@click.option('--profile', type=click.Choice(['uvicorn', 'gunicorn']), required=False, help='Perfil de servidor (por defecto, el de la configuración)')
+@click.option('--workers', '-w', type=click.IntRange(min=1), required=False, help='Cantidad de workers (por defecto, uno por CPU)')
+@click.option('--port', type=int, required=False, help='Puerto (por defecto 8000)')
+def serve(profile, workers, port):
+    from src.build import server_command
+    config = get_config()
+    config.load_data()
+    root = f'{config.path_parent}/{config.project_name}'
+    profile = profile or ('gunicorn' if config.gunicorn else 'uvicorn')
+    check_profile(root, profile)
+    env = dict(os.environ)
+    if workers:
+        env['WEB_CONCURRENCY'] = str(workers)
+    if port:
+        env['PORT'] = str(port)
+    package = 'app.backend' if config.preact else 'app'
+    import subprocess
+    sys.exit(subprocess.run(server_command(root, package, profile), cwd=root, env=env).returncode)
+
+@main.command()
+@click.option('--profile', type=click.Choice(['uvicorn', 'gunicorn']), required=False, help='Perfil de servidor (por defecto, el de la configuración)')
+@click.option('--workers', '-w', type=click.IntRange(min=1), required=False, help='Cantidad de workers (por defecto, uno por CPU)')
+@click.option('--port', type=int, default=8765, show_default=True, help='Puerto del servidor durante el benchmark')
+@click.option('--duration', '-d', type=float, default=10.0, show_default=True, help='Segundos de carga medidos')
+@click.option('--concurrency', '-c', type=click.IntRange(min=1), default=32, show_default=True, help='Peticiones simultáneas')
+@click.option('--tolerance', type=float, default=0.10, show_default=True, help='Regresión tolerada respecto a la línea base')
+@click.option('--save-baseline', is_flag=True, help='Guardar el resultado como nueva línea base')
+def bench(profile, workers, port, duration, concurrency, tolerance, save_baseline):
+    from src.bench import bench_project
+    config = get_config()
+    config.load_data()
+    root = f'{config.path_parent}/{config.project_name}'
+    profile = profile or ('gunicorn' if config.gunicorn else 'uvicorn')
+    check_profile(root, profile)
+    package = 'app.backend' if config.preact else 'app'
+    args = ['--duration', str(duration), '--concurrency', str(concurrency), '--tolerance', str(tolerance)]
+    if save_baseline:
+        args.append('--save-baseline')
+    try:
+        code = bench_project(root, package, profile, workers, port, args)
+    except RuntimeError as e:
+        print_error(e)
+        code = 1
+    sys.exit(code)
+
+@main.command()
+@click.argument('sources', nargs=-1, required=True, type=click.Path(exists=True))
+@click.option('--jobs', '-j', type=click.IntRange(min=1), required=False, help='Proyectos construidos en paralelo (por defecto, uno por CPU)')
+@click.option('--venv-template', is_flag=True, help='Clonar el .venv desde una plantilla en caché con las dependencias ya instaladas')
+@click.option('--wheelhouse', type=click.Path(file_okay=False), envvar='MCF_WHEELHOUSE', required=False, help='Instalar dependencias sin red desde este directorio de wheels')
+@click.option('--update', is_flag=True, help='Reescribir los archivos cuya plantilla cambió y que no fueron editados')
+def build_many(sources, jobs, venv_template, wheelhouse, update):
+    from rich.table import Table
+    from rich.markup import escape
+    from src.config import Config, ConfigError, get_console
+    from src.build import build_many, collect_configs
+    configs = []
+    invalid = []
+    for path in collect_configs(sources):
+        try:
+            configs.append(Config.from_file(path))
+        except (OSError, ConfigError) as e:
+            # Una configuración inválida no se construye con valores por defecto
+            invalid.append((path, str(e)))
+    table = Table(title="build-many")
+    table.add_column("Proyecto", justify="left", style="cyan")
+    for column in ('Render', 'Archivos', 'Venv', 'Total'):
+        table.add_column(column, justify="right", style="magenta")
+    table.add_column("Estado", justify="left")
+    start = time.perf_counter()
+    failed = len(invalid)
+    for path, error in invalid:
+        table.add_row(path, *('-' for _ in range(4)), f'[red]{escape(error)}[/red]')
+    for result in build_many(configs, jobs, venv_template, wheelhouse, update):
+        timings = result['timings']
+        report = result['report'] or {}
+        failed += bool(result['errors'])
+        status = '[red]' + escape('; '.join(result['errors'])) + '[/red]' if result['errors'] else \
+            ', '.join(f'{len(paths)} {status}' for status, paths in report.items() if paths)
+        table.add_row(result['root'], *(f'{timings[key] * 1000:.0f} ms' if key in timings else '-' for key in ('render', 'files', 'venv', 'total')), status)
+    console = get_console()
+    console.print(table)
+    console.print(f'{len(configs) + len(invalid)} proyectos en {time.perf_counter() - start:.2f} s')
+    if failed:
+        sys.exit(1)
 
 @main.command()
-def build_config():
-    config.build_config()
-    config.save_data()
+@click.argument('directory', type=click.Path(file_okay=False))
+def build_wheelhouse(directory):
+    from src.scaffold import build_manifest
+    from src.environment import build_wheelhouse
+    config = get_config()
+    config.load_data()
+    build_wheelhouse(build_manifest(config).files['requirements.txt'], directory)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,156 @@
+import os
+import re
+import json
+import gzip
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from src.files import cache_dir, atomic_write
+
+# Paso de build de los estáticos de un proyecto generado: descarga (vendoriza)
+# las librerías que las plantillas cargaban desde CDN, copia cada archivo con
+# el hash del contenido en el nombre y escribe al lado las variantes .gz y .br
+# para que el servidor no comprima en cada petición. El mapa nombre lógico ->
+# nombre con hash queda en static/assets.json.
+
+CACHE_DIR = cache_dir('assets')
+ASSETS_FILE = 'assets.json'
+VENDOR_ASSETS = {
+    'vendor/bootstrap.min.css': 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0-alpha3/dist/css/bootstrap.min.css',
+    'vendor/bootstrap.bundle.min.js': 'https://cdn.jsdelivr.net/npm/bootstrap@5.3.0-alpha3/dist/js/bootstrap.bundle.min.js',
+    'vendor/jquery.min.js': 'https://code.jquery.com/jquery-3.6.4.min.js',
+    'vendor/popper.min.js': 'https://cdn.jsdelivr.net/npm/@popperjs/core@2.11.7/dist/umd/popper.min.js',
+    'vendor/bootstrap.min.js': 'https://maxcdn.bootstrapcdn.com/bootstrap/5.3.0/js/bootstrap.min.js',
+}
+COMPRESSIBLE = ('.css', '.js', '.mjs', '.map', '.json', '.svg', '.html', '.txt', '.xml', '.wasm')
+ENCODINGS = ('.gz', '.br')
+# Nombre ya procesado: nombre.<hash de 10 hex>.ext
+FINGERPRINTED = re.compile(r'\.[0-9a-f]{10}$')
+# Por debajo de este tamaño la cabecera de compresión no compensa
+MIN_SIZE = 256
+WORKERS = 8
+
+def fetch(url:str, offline:bool=False):
+    # Las descargas se guardan por URL; con las versiones fijadas no caducan
+    cache = os.path.join(CACHE_DIR, hashlib.sha256(url.encode()).hexdigest()[:24])
+    if os.path.exists(cache):
+        with open(cache, 'rb') as file:
+            return file.read()
+    if offline:
+        raise OSError(f'{url} no está en la caché de assets ({CACHE_DIR})')
+    from urllib.request import urlopen
+    with urlopen(url, timeout=30) as response:
+        content = response.read()
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    atomic_write(cache, content)
+    return content
+
+def vendor(static_dir:str, offline:bool=False, workers:int=WORKERS):
+    def download(item):
+        name, url = item
+        content = fetch(url, offline)
+        path = os.path.join(static_dir, name)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as file:
+            file.write(content)
+        return name
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(download, VENDOR_ASSETS.items()))
+
+def _brotli():
+    try:
+        import brotli
+    except ImportError:
+        return None
+    return brotli
+
+def fingerprinted_name(name:str, content:bytes):
+    digest = hashlib.sha256(content).hexdigest()[:10]
+    root, ext = os.path.splitext(name)
+    return f'{root}.{digest}{ext}'
+
+def _sources(static_dir:str):
+    for folder, _, files in os.walk(static_dir):
+        for filename in files:
+            if filename == ASSETS_FILE or filename.endswith(ENCODINGS) or filename.endswith('.tmp'):
+                continue
+            if FINGERPRINTED.search(os.path.splitext(filename)[0]):
+                continue
+            yield os.path.relpath(os.path.join(folder, filename), static_dir).replace(os.sep, '/')
+
+def _write(path:str, content:bytes):
+    if os.path.exists(path):
+        return
+    atomic_write(path, content)
+
+def _process(static_dir:str, name:str, brotli):
+    with open(os.path.join(static_dir, name), 'rb') as file:
+        content = file.read()
+    target = fingerprinted_name(name, content)
+    path = os.path.join(static_dir, target)
+    # El nombre depende del contenido: si ya existe está al día
+    _write(path, content)
+    return name, target, _compress(path, content, brotli)
+
+def _compress(path:str, content:bytes, brotli):
+    sizes = {'raw': len(content), 'gz': None, 'br': None}
+    if path.endswith(COMPRESSIBLE) and len(content) >= MIN_SIZE:
+        compressed = gzip.compress(content, 9, mtime=0)
+        if len(compressed) < len(content):
+            _write(path + '.gz', compressed)
+            sizes['gz'] = len(compressed)
+        if brotli:
+            compressed = brotli.compress(content, quality=11)
+            if len(compressed) < len(content):
+                _write(path + '.br', compressed)
+                sizes['br'] = len(compressed)
+    return sizes
+
+def _remove_stale(static_dir:str, previous:dict, current:dict):
+    keep = set(current.values())
+    for target in set(previous.values()) - keep:
+        for path in (target, target + '.gz', target + '.br'):
+            try:
+                os.remove(os.path.join(static_dir, path))
+            except FileNotFoundError:
+                pass
+
+def build_assets(static_dir:str, vendor_assets:bool=True, offline:bool=False, workers:int=WORKERS):
+    os.makedirs(static_dir, exist_ok=True)
+    vendored = vendor(static_dir, offline, workers) if vendor_assets else []
+    manifest_path = os.path.join(static_dir, ASSETS_FILE)
+    try:
+        with open(manifest_path, 'r') as file:
+            previous = json.load(file)
+    except (OSError, ValueError):
+        previous = {}
+
+    brotli = _brotli()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda name: _process(static_dir, name, brotli), sorted(_sources(static_dir))))
+    manifest = {name: target for name, target, _ in results}
+    _remove_stale(static_dir, previous, manifest)
+    atomic_write(manifest_path, json.dumps(manifest, indent=2, sort_keys=True))
+    return {
+        'vendored': vendored,
+        'files': {name: {'path': target, **sizes} for name, target, sizes in results},
+        'brotli': brotli is not None,
+    }
+
+def precompress(directory:str, workers:int=WORKERS):
+    # Para salidas que ya llevan el hash en el nombre (el dist/ de Vite): solo
+    # se escriben las variantes comprimidas, sin copiar ni renombrar
+    brotli = _brotli()
+    def process(path):
+        with open(path, 'rb') as file:
+            content = file.read()
+        # Un build nuevo reutiliza nombres como index.html: la variante vieja no vale
+        for suffix in ENCODINGS:
+            try:
+                os.remove(path + suffix)
+            except FileNotFoundError:
+                pass
+        return os.path.relpath(path, directory).replace(os.sep, '/'), _compress(path, content, brotli)
+    paths = [os.path.join(folder, filename) for folder, _, files in os.walk(directory) for filename in files if not filename.endswith(ENCODINGS)]
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        files = dict(pool.map(process, sorted(paths)))
+    return {'vendored': [], 'files': {name: {'path': name, **sizes} for name, sizes in files.items()}, 'brotli': brotli is not None}
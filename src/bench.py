@@ -0,0 +1,51 @@
+import os
+import time
+import socket
+import signal
+import tempfile
+import subprocess
+from src.build import project_python, server_command
+
+# `bench`: arranca el proyecto con su perfil de servidor, ejecuta el bench.py
+# generado contra él y detiene el servidor. El informe y la comparación con
+# la línea base quedan en <proyecto>/bench/.
+
+def wait_port(port:int, process, timeout:float=30.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            return False
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return True
+        except OSError:
+            time.sleep(0.1)
+    return False
+
+def stop_server(process, timeout:float=15.0):
+    if process.poll() is not None:
+        return
+    process.send_signal(signal.SIGTERM if os.name != 'nt' else signal.CTRL_BREAK_EVENT)
+    try:
+        process.wait(timeout)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+def bench_project(root:str, package:str, profile:str, workers:int=None, port:int=8765, args:list=()):
+    env = dict(os.environ, PORT=str(port), HOST='127.0.0.1')
+    if workers:
+        env['WEB_CONCURRENCY'] = str(workers)
+    # Los logs del servidor van a un archivo temporal: un pipe que nadie lee
+    # se llena durante la carga y bloquea al servidor en sus propios logs
+    with tempfile.TemporaryFile() as log:
+        server = subprocess.Popen(server_command(root, package, profile), cwd=root, env=env, stdout=subprocess.DEVNULL, stderr=log)
+        try:
+            if not wait_port(port, server):
+                stop_server(server)
+                log.seek(0)
+                raise RuntimeError(f'El servidor no arrancó:\n{log.read().decode(errors="replace")}')
+            command = [project_python(root), 'bench.py', '--url', f'http://127.0.0.1:{port}', '--pid', str(server.pid), '--label', profile, *args]
+            return subprocess.run(command, cwd=root).returncode
+        finally:
+            stop_server(server)
@@ -0,0 +1,137 @@
+import os
+import sys
+import glob
+import time
+import shutil
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+from src.scaffold import build_manifest, FRONTEND_DIR
+from src.environment import create_venv, ensure_template, python_in
+
+# Construcción de proyectos: un proyecto (venv y archivos en paralelo) o
+# muchos a la vez, con los manifiestos generados una sola vez en el proceso
+# principal y el trabajo de disco repartido en un pool de procesos.
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    function(*args)
+    return time.perf_counter() - start
+
+def build_frontend(root:str):
+    # npm install + vite build del frontend preact y variantes .gz/.br de dist/
+    from src.assets import precompress
+    frontend = os.path.join(root, FRONTEND_DIR)
+    npm = shutil.which('npm')
+    if npm is None:
+        raise OSError('npm no está instalado: no se puede construir el frontend')
+    install = 'ci' if os.path.exists(os.path.join(frontend, 'package-lock.json')) else 'install'
+    subprocess.run([npm, install, '--no-audit', '--no-fund'], cwd=frontend, check=True, stdout=subprocess.DEVNULL)
+    subprocess.run([npm, 'run', 'build'], cwd=frontend, check=True, stdout=subprocess.DEVNULL)
+    return precompress(os.path.join(frontend, 'dist'))
+
+def build_project(root:str, manifest, venv_template:bool=False, wheelhouse:str=None, incremental:bool=False, output=None):
+    # output: destino de los archivos (src.output); por defecto, el disco.
+    # Las salidas virtuales (memoria, tar/zip) no crean venv ni frontend.
+    from src.output import FileSystemOutput
+    output = output or FileSystemOutput(root)
+    start = time.perf_counter()
+    result = {'root': root, 'report': None, 'errors': [], 'timings': {}}
+    timings = result['timings']
+    if not output.real:
+        try:
+            result['report'] = output.write(manifest, incremental, timings)
+        except Exception as e:
+            result['errors'].append(str(e))
+        timings['total'] = time.perf_counter() - start
+        return result
+    os.makedirs(root, exist_ok=True)
+    # El venv se crea mientras se escriben los archivos del proyecto; el build
+    # del frontend (si lo hay) empieza en cuanto existe package.json
+    venv_timings = {}
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        venv = pool.submit(create_venv, f'{root}/.venv', manifest.files.get('requirements.txt'), wheelhouse, venv_template, venv_timings)
+        try:
+            result['report'] = output.write(manifest, incremental, timings)
+        except Exception as e:
+            result['errors'].append(str(e))
+        frontend = None
+        if f'{FRONTEND_DIR}/package.json' in manifest.files and not result['errors']:
+            frontend = pool.submit(_timed, build_frontend, root)
+        try:
+            venv.result()
+        except (OSError, subprocess.CalledProcessError) as e:
+            result['errors'].append(str(e))
+        if frontend is not None:
+            try:
+                timings['frontend'] = frontend.result()
+            except (OSError, subprocess.CalledProcessError) as e:
+                result['errors'].append(str(e))
+    # create_venv anota 'venv' y 'deps' en su propio hilo
+    timings.update(venv_timings)
+    timings['total'] = time.perf_counter() - start
+    return result
+
+def collect_configs(sources):
+    paths = []
+    for source in sources:
+        if os.path.isdir(source):
+            paths.extend(sorted(glob.glob(os.path.join(source, '*.json'))))
+        else:
+            paths.append(source)
+    return paths
+
+def build_many(configs:list, jobs:int=None, venv_template:bool=False, wheelhouse:str=None, incremental:bool=False):
+    projects = {}
+    for config in configs:
+        root = f'{config.path_parent}/{config.project_name}'
+        if root in projects:
+            yield {'root': root, 'report': None, 'errors': ['Proyecto duplicado: otra configuración genera la misma ruta'], 'timings': {}}
+            continue
+        start = time.perf_counter()
+        try:
+            projects[root] = (build_manifest(config), time.perf_counter() - start)
+        except Exception as e:
+            yield {'root': root, 'report': None, 'errors': [f'No se pudo generar el proyecto: {e}'], 'timings': {}}
+    if venv_template:
+        # Cada plantilla se construye una vez antes de repartir los proyectos;
+        # si una falla, solo fallan los proyectos que la usan
+        failed = {}
+        for requirements in {manifest.files.get('requirements.txt') for manifest, _ in projects.values()}:
+            if requirements:
+                try:
+                    ensure_template(requirements, wheelhouse)
+                except (OSError, subprocess.CalledProcessError) as e:
+                    failed[requirements] = f'No se pudo crear la plantilla del venv: {e}'
+        for root, (manifest, render) in list(projects.items()):
+            error = failed.get(manifest.files.get('requirements.txt'))
+            if error:
+                del projects[root]
+                yield {'root': root, 'report': None, 'errors': [error], 'timings': {'render': render}}
+    if not projects:
+        return
+    jobs = jobs or min(len(projects), os.cpu_count() or 1)
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(build_project, root, manifest, venv_template, wheelhouse, incremental): (root, render) for root, (manifest, render) in projects.items()}
+        for future in as_completed(futures):
+            root, render = futures[future]
+            try:
+                result = future.result()
+            except Exception as e:
+                # Un proyecto que falla (o un worker que muere) no corta el lote
+                result = {'root': root, 'report': None, 'errors': [str(e) or type(e).__name__], 'timings': {}}
+            result['timings']['render'] = render
+            yield result
+
+def project_python(root:str):
+    # Usa el intérprete del .venv del proyecto si existe
+    python = python_in(f'{root}/.venv')
+    return python if os.path.exists(python) else sys.executable
+
+def migrate_project(root:str, package:str):
+    return subprocess.run([project_python(root), '-m', f'{package}.migrate'], cwd=root).returncode
+
+def server_command(root:str, package:str, profile:str):
+    python = project_python(root)
+    if profile == 'gunicorn':
+        return [python, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', f'{package}.main:app']
+    return [python, 'serve.py']
@@ -0,0 +1,125 @@
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import tempfile
+import subprocess
+from src.files import cache_dir, atomic_write
+
+# Creación del .venv de los proyectos generados. Con `template=True` las
+# dependencias se instalan una sola vez en un venv plantilla, identificado
+# por el hash de los pines de requirements.txt y del intérprete, y cada
+# proyecto lo clona. Con un wheelhouse local la instalación no usa la red.
+# DEPS_FILE marca un venv con los pines ya instalados: si falta o los pines
+# cambiaron, el siguiente build vuelve a instalar en el venv existente.
+
+CACHE_DIR = cache_dir('venvs')
+TEMPLATE_FILE = 'template.json'
+DEPS_FILE = 'my-conf-fastapi.json'
+BIN_DIR = 'Scripts' if os.name == 'nt' else 'bin'
+
+def pins(requirements:str):
+    return sorted({line.strip() for line in requirements.splitlines() if line.strip() and not line.strip().startswith('#')})
+
+def requirements_hash(requirements:str):
+    key = '\n'.join([sys.version, os.path.realpath(sys.executable), *pins(requirements)])
+    return hashlib.sha256(key.encode()).hexdigest()[:16]
+
+def python_in(venv:str):
+    return os.path.join(venv, BIN_DIR, 'python.exe' if os.name == 'nt' else 'python')
+
+def installed_hash(venv:str):
+    try:
+        with open(os.path.join(venv, DEPS_FILE)) as file:
+            return json.load(file).get('requirements')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+def mark_installed(venv:str, requirements:str):
+    atomic_write(os.path.join(venv, DEPS_FILE), json.dumps({'requirements': requirements_hash(requirements)}))
+
+def pip_install(venv:str, requirements:str, wheelhouse:str=None):
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as file:
+        file.write('\n'.join(pins(requirements)))
+    command = [python_in(venv), '-m', 'pip', 'install', '-q', '--disable-pip-version-check', '-r', file.name]
+    if wheelhouse:
+        command += ['--no-index', '--find-links', wheelhouse]
+    try:
+        subprocess.run(command, check=True)
+    finally:
+        os.remove(file.name)
+
+def build_wheelhouse(requirements:str, wheelhouse:str):
+    os.makedirs(wheelhouse, exist_ok=True)
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as file:
+        file.write('\n'.join(pins(requirements)))
+    try:
+        subprocess.run([sys.executable, '-m', 'pip', 'wheel', '-q', '--disable-pip-version-check', '-r', file.name, '-w', wheelhouse], check=True)
+    finally:
+        os.remove(file.name)
+
+def ensure_template(requirements:str, wheelhouse:str=None):
+    path = os.path.join(CACHE_DIR, requirements_hash(requirements))
+    if os.path.exists(os.path.join(path, TEMPLATE_FILE)):
+        return path
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # Se construye en un directorio temporal y se publica con os.replace para
+    # que dos builds simultáneos nunca vean una plantilla a medias.
+    build = tempfile.mkdtemp(prefix='build-', dir=CACHE_DIR)
+    try:
+        subprocess.run([sys.executable, '-m', 'venv', build], check=True)
+        pip_install(build, requirements, wheelhouse)
+        with open(os.path.join(build, TEMPLATE_FILE), 'w') as file:
+            json.dump({'path': build, 'pins': pins(requirements)}, file)
+        try:
+            os.replace(build, path)
+        except OSError:
+            # Otro proceso publicó la misma plantilla primero
+            shutil.rmtree(build, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(build, ignore_errors=True)
+        raise
+    return path
+
+def clone_venv(template:str, path:str):
+    with open(os.path.join(template, TEMPLATE_FILE), 'r') as file:
+        source = json.load(file)['path'].encode()
+    shutil.copytree(template, path, symlinks=True, ignore=shutil.ignore_patterns(TEMPLATE_FILE))
+    # Los scripts de bin/ llevan la ruta absoluta del venv en el shebang
+    target = os.path.abspath(path).encode()
+    bin_dir = os.path.join(path, BIN_DIR)
+    for name in os.listdir(bin_dir):
+        script = os.path.join(bin_dir, name)
+        if os.path.islink(script) or not os.path.isfile(script):
+            continue
+        with open(script, 'rb') as file:
+            content = file.read()
+        if source in content:
+            with open(script, 'wb') as file:
+                file.write(content.replace(source, target))
+
+def create_venv(path:str, requirements:str=None, wheelhouse:str=None, template:bool=False, timings:dict=None):
+    # timings recibe 'venv' (crear o clonar) y 'deps' (instalar dependencias)
+    timings = {} if timings is None else timings
+    start = time.perf_counter()
+    if not os.path.exists(os.path.join(path, 'pyvenv.cfg')):
+        if template and requirements:
+            # La instalación de dependencias ocurre al construir la plantilla
+            source = ensure_template(requirements, wheelhouse)
+            timings['deps'] = time.perf_counter() - start
+            start = time.perf_counter()
+            clone_venv(source, path)
+            timings['venv'] = time.perf_counter() - start
+            mark_installed(path, requirements)
+            return path
+        subprocess.run([sys.executable, '-m', 'venv', path], check=True)
+        timings['venv'] = time.perf_counter() - start
+    if requirements and installed_hash(path) != requirements_hash(requirements):
+        # Sin wheelhouse, pip instala los pines desde el índice
+        start = time.perf_counter()
+        pip_install(path, requirements, wheelhouse)
+        timings['deps'] = time.perf_counter() - start
+        mark_installed(path, requirements)
+    return path
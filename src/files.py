@@ -0,0 +1,21 @@
+import os
+
+# Utilidades de archivos compartidas: la caché de usuario del CLI y la
+# escritura atómica (temporal + os.replace) que usan la configuración, las
+# cachés y los archivos generados.
+
+def cache_dir(*parts:str):
+    # ~/.cache/my-conf-fastapi, o $XDG_CACHE_HOME/my-conf-fastapi
+    return os.path.join(os.getenv('XDG_CACHE_HOME', os.path.expanduser('~/.cache')), 'my-conf-fastapi', *parts)
+
+def atomic_write(path:str, content):
+    # Quien lee nunca ve un archivo a medias; si algo falla no queda el temporal
+    tmp = f'{path}.{os.getpid()}.tmp'
+    try:
+        with open(tmp, 'wb' if isinstance(content, bytes) else 'w') as file:
+            file.write(content)
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
@@ -0,0 +1,166 @@
+import io
+import os
+import time
+import tarfile
+import zipfile
+from src.scaffold import write_manifest, content_hash, dump_hashes, load_hashes, sync_status, orphan_status, new_report, HASHES_FILE
+
+# Destinos de build_config para el manifiesto renderizado:
+#
+#   FileSystemOutput  el disco (venv, dependencias y frontend incluidos)
+#   MemoryOutput      un sistema de archivos virtual en memoria: dry run y
+#                     pruebas, sin escribir ni lanzar procesos. Con `root`
+#                     parte del proyecto en disco, así el informe muestra
+#                     lo que haría un build real (actualizados, conflictos)
+#   ArchiveOutput     un tar.gz o zip escrito en streaming (p. ej. a stdout)
+#
+# Todos devuelven el mismo informe que write_manifest y anotan los tiempos
+# de las fases 'dirs' y 'files'.
+
+class FileSystemOutput():
+    # Solo en disco se pueden crear el venv y compilar el frontend
+    real = True
+
+    def __init__(self, root:str):
+        self.root = root
+
+    def write(self, manifest, incremental:bool=False, timings:dict=None):
+        return write_manifest(self.root, manifest, incremental=incremental, timings=timings)
+
+    def close(self):
+        pass
+
+class MemoryOutput():
+    real = False
+
+    def __init__(self, root:str=None):
+        self.root = root
+        self.files:dict = {}
+        self.dirs:set = set()
+        self.hashes:dict = load_hashes(root) if root else {}
+        # Borrados en la simulación: el disco ya no cuenta para ellos
+        self.removed:set = set()
+
+    def _current(self, path:str):
+        # Primero la memoria; después, solo lectura, el proyecto en disco
+        if path in self.files or path in self.removed or not self.root:
+            return self.files.get(path)
+        try:
+            with open(os.path.join(self.root, path), 'rb') as file:
+                self.files[path] = file.read()
+        except FileNotFoundError:
+            return None
+        return self.files[path]
+
+    def write(self, manifest, incremental:bool=False, timings:dict=None):
+        timings = {} if timings is None else timings
+        start = time.perf_counter()
+        self.dirs.update(manifest.directories())
+        timings['dirs'] = time.perf_counter() - start
+        start = time.perf_counter()
+        report = new_report()
+        for path, content in manifest.files.items():
+            data = content.encode()
+            new = content_hash(data)
+            current = self._current(path)
+            if current is None:
+                status, digest = 'created', new
+            else:
+                status, digest = sync_status(content_hash(current), new, self.hashes.get(path), incremental)
+            if status in ('created', 'updated'):
+                self.files[path] = data
+                self.removed.discard(path)
+            report[status].append(path)
+            if digest is not None:
+                self.hashes[path] = digest
+        for path in sorted(set(self.hashes) - set(manifest.files)):
+            current = self._current(path)
+            status, tracked = orphan_status(None if current is None else content_hash(current), self.hashes[path], incremental)
+            if status == 'removed':
+                self.files.pop(path, None)
+                self.removed.add(path)
+            if status is not None:
+                report[status].append(path)
+            if not tracked:
+                del self.hashes[path]
+        self.files[HASHES_FILE] = dump_hashes(self.hashes).encode()
+        timings['files'] = time.perf_counter() - start
+        return report
+
+    def read(self, path:str):
+        return self.files[path].decode()
+
+    def close(self):
+        pass
+
+class ArchiveOutput():
+    real = False
+
+    def __init__(self, stream, format:str='tar', prefix:str=''):
+        if format not in ('tar', 'zip'):
+            raise ValueError(f'Formato de archivo desconocido: {format}')
+        self.format = format
+        self.prefix = prefix.strip('/')
+        # Modos de streaming: ninguno necesita hacer seek en la salida
+        if format == 'tar':
+            self._archive = tarfile.open(fileobj=stream, mode='w|gz')
+        else:
+            self._archive = zipfile.ZipFile(stream, mode='w', compression=zipfile.ZIP_DEFLATED)
+
+    def _name(self, path:str):
+        return f'{self.prefix}/{path}' if self.prefix else path
+
+    def _add_dir(self, name:str, mtime:float):
+        if self.format == 'tar':
+            info = tarfile.TarInfo(name)
+            info.type = tarfile.DIRTYPE
+            info.mode = 0o755
+            info.mtime = mtime
+            self._archive.addfile(info)
+        else:
+            self._archive.writestr(zipfile.ZipInfo(name + '/', time.localtime(mtime)[:6]), b'')
+
+    def _add_file(self, path:str, data:bytes, mtime:float):
+        if self.format == 'tar':
+            info = tarfile.TarInfo(self._name(path))
+            info.size = len(data)
+            info.mode = 0o644
+            info.mtime = mtime
+            self._archive.addfile(info, io.BytesIO(data))
+        else:
+            info = zipfile.ZipInfo(self._name(path), time.localtime(mtime)[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            info.external_attr = 0o644 << 16
+            self._archive.writestr(info, data)
+
+    def write(self, manifest, incremental:bool=False, timings:dict=None):
+        timings = {} if timings is None else timings
+        mtime = time.time()
+        start = time.perf_counter()
+        if self.prefix:
+            self._add_dir(self.prefix, mtime)
+        for path in manifest.directories():
+            self._add_dir(self._name(path), mtime)
+        timings['dirs'] = time.perf_counter() - start
+        start = time.perf_counter()
+        hashes = {}
+        for path, content in manifest.files.items():
+            data = content.encode()
+            self._add_file(path, data, mtime)
+            hashes[path] = content_hash(data)
+        # Con el archivo de hashes, `build-config --update` funciona tras extraerlo
+        self._add_file(HASHES_FILE, dump_hashes(hashes).encode(), mtime)
+        timings['files'] = time.perf_counter() - start
+        report = new_report()
+        report['created'] = list(manifest.files)
+        return report
+
+    def close(self):
+        self._archive.close()
+
+def open_output(kind:str, root:str, stream=None, prefix:str=''):
+    if kind == 'fs':
+        return FileSystemOutput(root)
+    if kind == 'memory':
+        return MemoryOutput(root)
+    return ArchiveOutput(stream, kind, prefix or os.path.basename(root.rstrip('/')))
@@ -0,0 +1,85 @@
+import os
+import sys
+import json
+import shutil
+import hashlib
+import sysconfig
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+from importlib import metadata
+from src.files import cache_dir, atomic_write
+
+# Sondeo de herramientas (npm, python, virtualenv). Los comandos se lanzan en
+# paralelo y el resultado se guarda junto a una huella del entorno (PATH,
+# intérprete y mtimes de las herramientas); mientras la huella no cambie,
+# las siguientes ejecuciones no vuelven a lanzar ningún proceso.
+
+CACHE_DIR = cache_dir()
+CACHE_FILE = os.path.join(CACHE_DIR, 'probe.json')
+
+TOOLS = {
+    'npm': ['npm', '--version'],
+    'python': ['python', '--version'],
+}
+
+def _mtime(path:str):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+def fingerprint():
+    tools = {name: shutil.which(command[0]) for name, command in TOOLS.items()}
+    site_packages = sysconfig.get_paths()['purelib']
+    data = {
+        'path': os.getenv('PATH', ''),
+        'executable': sys.executable,
+        'tools': {name: [path, _mtime(path) if path else None] for name, path in tools.items()},
+        'site_packages': [site_packages, _mtime(site_packages)],
+    }
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+def _run(command:list):
+    try:
+        result = subprocess.run(command, capture_output=True, text=True)
+    except OSError:
+        return None
+    if result.returncode != 0:
+        return None
+    # `python --version` escribe en stderr en versiones antiguas
+    words = (result.stdout.strip() or result.stderr.strip()).split()
+    return words[-1] if words else None
+
+def _distribution_version(name:str):
+    try:
+        return metadata.version(name)
+    except metadata.PackageNotFoundError:
+        return None
+
+def _load_cache(key:str):
+    try:
+        with open(CACHE_FILE, 'r') as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        return None
+    return data.get('results') if data.get('fingerprint') == key else None
+
+def _save_cache(key:str, results:dict):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        atomic_write(CACHE_FILE, json.dumps({'fingerprint': key, 'results': results}))
+    except OSError:
+        pass
+
+def probe(use_cache:bool=True):
+    key = fingerprint()
+    if use_cache:
+        cached = _load_cache(key)
+        if cached is not None:
+            return cached
+    with ThreadPoolExecutor(max_workers=len(TOOLS)) as pool:
+        futures = {name: pool.submit(_run, command) for name, command in TOOLS.items()}
+        results = {name: future.result() for name, future in futures.items()}
+    results['virtualenv'] = _distribution_version('virtualenv')
+    _save_cache(key, results)
+    return results
@@ -0,0 +1,233 @@
+import os
+import json
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from src.templates import render
+from src.files import atomic_write
+from src.assets import VENDOR_ASSETS
+
+# El proyecto generado se describe como un manifiesto en memoria
+# (ruta relativa -> contenido) renderizado desde src/templates. El escritor
+# crea cada directorio una sola vez, de menor a mayor profundidad, y escribe
+# los archivos en paralelo.
+
+WORKERS = 8
+# Hashes del contenido generado, guardados en el proyecto para `--update`
+HASHES_FILE = '.my-conf-fastapi.json'
+
+class Manifest():
+    def __init__(self):
+        self.files:dict = {}
+        self.dirs:set = set()
+
+    def add(self, path:str, content:str=''):
+        # La primera entrada gana: no se pisan archivos ya añadidos
+        self.files.setdefault(path, content)
+
+    def add_dir(self, path:str):
+        self.dirs.add(path)
+
+    def directories(self):
+        dirs = set()
+        for path in (*self.dirs, *(os.path.dirname(path) for path in self.files)):
+            while path and path not in dirs:
+                dirs.add(path)
+                path = os.path.dirname(path)
+        return sorted(dirs, key=lambda path: (path.count('/'), path))
+
+# Archivos de src/templates/project, relativos a `app/` salvo los de la raíz
+APP_FILES = (
+    '__init__.py',
+    'routers/__init__.py',
+    'middlewares/__init__.py',
+    'models/__init__.py',
+    'models/user.py',
+    'database.py',
+    'middlewares/token_auth.py',
+    'middlewares/metrics.py',
+    'metrics.py',
+    'routers/router.py',
+    'routers/media.py',
+    'routers/metrics.py',
+    'settings.py',
+    'main.py',
+    'migrate.py',
+)
+STATIC_FILES = (
+    ('static/js/index.js', {}),
+    ('templates/index.html', {'title': 'My Config FastAPI'}),
+    ('templates/admin.html', {'title': 'Panel de Administrador'}),
+)
+CACHE_FILES = ('cache/__init__.py', 'cache/backends.py')
+# Frontend de la variante preact (src/templates/project/frontend -> app/frontend)
+FRONTEND_DIR = 'app/frontend'
+FRONTEND_FILES = (
+    'package.json',
+    'vite.config.js',
+    'index.html',
+    'src/main.jsx',
+    'src/style.css',
+    'src/pages/home.jsx',
+    'src/pages/admin.jsx',
+)
+ROOT_FILES = ('.gitignore', 'README.md', 'requirements.txt', 'serve.py', 'bench.py')
+
+def template_context(config):
+    return {
+        'project_name': config.project_name,
+        'preact': config.preact,
+        'only_api': config.only_api and not config.preact,
+        # Páginas HTML renderizadas en el servidor (solo la variante por defecto)
+        'pages': not config.preact and not config.only_api,
+        'package': 'app.backend' if config.preact else 'app',
+        'uvicorn': config.uvicorn,
+        'gunicorn': config.gunicorn,
+        'db': config.db,
+        'cache': config.cache,
+        'vendor_assets': VENDOR_ASSETS,
+        'minimal': not config.preact,
+    }
+
+def build_manifest(config):
+    manifest = Manifest()
+    context = template_context(config)
+    app = 'app/backend' if config.preact else 'app'
+    for folder in ('routers', 'media', 'models', 'middlewares'):
+        manifest.add_dir(f'{app}/{folder}')
+    for name in APP_FILES:
+        manifest.add(f'{app}/{name}', render(f'project/app/{name}.tmpl', **context))
+    if not context['only_api']:
+        manifest.add(f'{app}/staticfiles.py', render('project/app/staticfiles.py.tmpl', **context))
+    if config.cache:
+        for name in CACHE_FILES:
+            manifest.add(f'{app}/{name}', render(f'project/app/{name}.tmpl', **context))
+    if config.preact:
+        for name in FRONTEND_FILES:
+            manifest.add(f'{FRONTEND_DIR}/{name}', render(f'project/frontend/{name}.tmpl', **context))
+    if context['pages']:
+        manifest.add_dir(f'{app}/static/css')
+        for name, extra in STATIC_FILES:
+            manifest.add(f'{app}/{name}', render(f'project/app/{name}.tmpl', **context, **extra))
+    for name in ROOT_FILES:
+        manifest.add(name, render(f'project/{name}.tmpl', **context))
+    if config.gunicorn:
+        manifest.add('gunicorn.conf.py', render('project/gunicorn.conf.py.tmpl', **context))
+    return manifest
+
+def content_hash(content:bytes):
+    return hashlib.sha256(content).hexdigest()
+
+def load_hashes(root:str):
+    try:
+        with open(os.path.join(root, HASHES_FILE), 'r') as file:
+            data = json.load(file)
+    except (OSError, ValueError):
+        return {}
+    files = data.get('files') if isinstance(data, dict) else None
+    return files if isinstance(files, dict) else {}
+
+def dump_hashes(hashes:dict):
+    return json.dumps({'version': 1, 'files': dict(sorted(hashes.items()))}, indent=2)
+
+def save_hashes(root:str, hashes:dict):
+    atomic_write(os.path.join(root, HASHES_FILE), dump_hashes(hashes))
+
+def sync_status(current:str, new:str, recorded:str, incremental:bool):
+    # Estado de un archivo que ya existe y hash a registrar: disco (_sync) y
+    # dry run en memoria (src.output) deciden igual
+    if current == new:
+        return 'unchanged', new
+    if not incremental:
+        return 'skipped', recorded
+    if new == recorded:
+        # La plantilla no cambió: las ediciones del usuario se respetan sin conflicto
+        return 'unchanged', recorded
+    if current != recorded:
+        # Editado por el usuario (o sin hash previo): no se pisa
+        return 'conflict', recorded
+    return 'updated', new
+
+def orphan_status(current:str, recorded:str, incremental:bool):
+    # Archivo registrado que el manifiesto ya no genera (app/cache/ tras
+    # --no-cache, gunicorn.conf.py sin gunicorn). Devuelve el estado y si su
+    # hash sigue registrado: sin --update solo se avisa; con --update se borra
+    # si no fue editado y, si lo fue, queda como archivo del usuario
+    if current is None:
+        return None, False
+    if not incremental:
+        return 'orphaned', True
+    if current == recorded:
+        return 'removed', False
+    return 'orphaned', False
+
+def new_report():
+    return {status: [] for status in ('created', 'updated', 'unchanged', 'skipped', 'conflict', 'removed', 'orphaned')}
+
+def _prune(root:str, directory:str, keep:set):
+    # Directorios que quedaron vacíos al borrar huérfanos, hasta la raíz
+    while directory and directory not in keep:
+        try:
+            os.rmdir(os.path.join(root, directory))
+        except OSError:
+            return
+        directory = os.path.dirname(directory)
+
+def _sync(path:str, content:str, recorded:str, incremental:bool):
+    data = content.encode()
+    new = content_hash(data)
+    # 'x' crea el archivo solo si no existe: sin os.path.exists previo
+    try:
+        with open(path, 'xb') as file:
+            file.write(data)
+        return 'created', new
+    except FileExistsError:
+        pass
+    with open(path, 'rb') as file:
+        current = content_hash(file.read())
+    status, digest = sync_status(current, new, recorded, incremental)
+    if status != 'updated':
+        return status, digest
+    atomic_write(path, data)
+    return 'updated', new
+
+def write_manifest(root:str, manifest:Manifest, workers:int=WORKERS, incremental:bool=False, timings:dict=None):
+    start = time.perf_counter()
+    os.makedirs(root, exist_ok=True)
+    for path in manifest.directories():
+        try:
+            os.mkdir(os.path.join(root, path))
+        except FileExistsError:
+            pass
+    if timings is not None:
+        timings['dirs'] = time.perf_counter() - start
+    start = time.perf_counter()
+    hashes = load_hashes(root)
+    paths = list(manifest.files)
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        results = list(pool.map(lambda path: _sync(os.path.join(root, path), manifest.files[path], hashes.get(path), incremental), paths))
+    report = new_report()
+    for path, (status, digest) in zip(paths, results):
+        report[status].append(path)
+        if digest is not None:
+            hashes[path] = digest
+    keep = set(manifest.directories())
+    for path in sorted(set(hashes) - set(manifest.files)):
+        full = os.path.join(root, path)
+        try:
+            with open(full, 'rb') as file:
+                current = content_hash(file.read())
+        except FileNotFoundError:
+            current = None
+        status, tracked = orphan_status(current, hashes[path], incremental)
+        if status == 'removed':
+            os.remove(full)
+            _prune(root, os.path.dirname(path), keep)
+        if status is not None:
+            report[status].append(path)
+        if not tracked:
+            del hashes[path]
+    save_hashes(root, hashes)
+    if timings is not None:
+        timings['files'] = time.perf_counter() - start
+    return report
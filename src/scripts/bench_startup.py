@@ -0,0 +1,94 @@
+import os
+import sys
+import time
+import argparse
+import statistics
+import subprocess
+
+# Benchmark de arranque en frío del CLI. Ejecuta `main.py` con
+# `python -X importtime` varias veces y falla (exit 1) si la mediana supera
+# el presupuesto o si se importan módulos que deberían cargarse bajo demanda.
+# Sin --command mide `--help` y `view-config`, el comando que llaman los
+# scripts de aprovisionamiento.
+#
+#   python src/scripts/bench_startup.py
+#   python src/scripts/bench_startup.py --command set-config --allow rich --allow src.config --budget-ms 160
+
+MAIN = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'CLI', 'main.py'))
+
+BUDGET_MS = 120.0
+RUNS = 10
+LAZY_MODULES = ('rich', 'pyfiglet', 'subprocess', 'src.config', 'src.scaffold', 'src.templates', 'src.assets', 'src.build')
+# Comando, módulos perezosos permitidos y presupuesto (variable de entorno, ms)
+DEFAULT_COMMANDS = (
+    ('--help', (), 'MCF_STARTUP_BUDGET_MS', BUDGET_MS),
+    # Importa rich para la tabla: el resto (plantillas, build) sigue fuera
+    ('view-config', ('rich', 'src.config'), 'MCF_VIEW_CONFIG_BUDGET_MS', 150.0),
+)
+
+def parse_importtime(stderr:str):
+    imports = {}
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        imports[name.strip()] = (int(self_us), int(cumulative_us))
+    return imports
+
+def run_once(args:list):
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='0')
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-X', 'importtime', MAIN, *args], capture_output=True, text=True, env=env)
+    elapsed = (time.perf_counter() - start) * 1000
+    if result.returncode != 0:
+        raise SystemExit(f'El comando falló ({result.returncode}):\n{result.stdout}{result.stderr}')
+    return elapsed, parse_importtime(result.stderr)
+
+def bench_command(command:str, allowed:tuple, budget_ms:float, runs:int, top:int):
+    args = command.split()
+    run_once(args)  # Calentar la caché de bytecode
+    timings = []
+    imports = {}
+    for _ in range(runs):
+        elapsed, imports = run_once(args)
+        timings.append(elapsed)
+
+    median = statistics.median(timings)
+    print(f'Comando: main.py {command}')
+    print(f'Mediana: {median:.1f} ms  min: {min(timings):.1f} ms  max: {max(timings):.1f} ms  presupuesto: {budget_ms:.1f} ms')
+    print('Imports más lentos (acumulado):')
+    for name, (_, cumulative) in sorted(imports.items(), key=lambda item: item[1][1], reverse=True)[:top]:
+        print(f'  {cumulative / 1000:8.2f} ms  {name}')
+
+    failed = False
+    allowed = tuple(allowed)
+    eager = sorted(name for name in imports if name.startswith(LAZY_MODULES) and not name.startswith(allowed))
+    if eager:
+        print(f'ERROR: módulos que deberían cargarse bajo demanda: {", ".join(eager)}')
+        failed = True
+    if median > budget_ms:
+        print(f'ERROR: el arranque ({median:.1f} ms) supera el presupuesto ({budget_ms:.1f} ms)')
+        failed = True
+    return failed
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark de arranque del CLI')
+    parser.add_argument('--command', help='Argumentos del CLI a medir (por defecto --help y view-config)')
+    parser.add_argument('--budget-ms', type=float, default=float(os.getenv('MCF_STARTUP_BUDGET_MS', BUDGET_MS)), help='Presupuesto de --command (ms)')
+    parser.add_argument('--runs', type=int, default=RUNS)
+    parser.add_argument('--allow', action='append', default=[], help='Módulo perezoso permitido para este comando')
+    parser.add_argument('--top', type=int, default=10, help='Cantidad de imports más lentos a mostrar')
+    options = parser.parse_args(argv)
+
+    if options.command:
+        commands = [(options.command, options.allow, options.budget_ms)]
+    else:
+        commands = [(command, allowed, float(os.getenv(variable, budget))) for command, allowed, variable, budget in DEFAULT_COMMANDS]
+    failed = False
+    for command, allowed, budget_ms in commands:
+        failed = bench_command(command, allowed, budget_ms, options.runs, options.top) or failed
+        print()
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,63 @@
+import os
+import sys
+import time
+import argparse
+import itertools
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from src.config import Config
+from src.scaffold import build_manifest
+from src.build import build_project
+from src.output import MemoryOutput
+
+# Genera todas las combinaciones de la matriz (preact × only-api × servidor ×
+# base de datos × caché) en un sistema de archivos en memoria y compila cada
+# .py generado. Sin disco, venv ni npm: la matriz completa tarda milisegundos.
+#
+#   python src/scripts/scaffold_matrix.py
+#   python src/scripts/scaffold_matrix.py --budget-ms 2000
+
+BUDGET_MS = 5000.0
+
+def matrix():
+    for preact, only_api, gunicorn, db, cache in itertools.product((False, True), (False, True), (False, True), ('sync', 'async', 'postgres'), (False, True)):
+        name = '-'.join(('preact' if preact else 'jinja', 'api' if only_api else 'pages', 'gunicorn' if gunicorn else 'uvicorn', db, 'cache' if cache else 'nocache'))
+        yield Config('/matrix', name, preact=preact, only_api=only_api, gunicorn=gunicorn, db=db, cache=cache)
+
+def check(config:Config):
+    output = MemoryOutput()
+    result = build_project(f'{config.path_parent}/{config.project_name}', build_manifest(config), output=output)
+    errors = list(result['errors'])
+    for path, data in output.files.items():
+        if path.endswith('.py'):
+            try:
+                compile(data, path, 'exec')
+            except SyntaxError as e:
+                errors.append(f'{path}:{e.lineno}: {e.msg}')
+    return len(output.files), errors
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Genera la matriz de configuraciones en memoria')
+    parser.add_argument('--budget-ms', type=float, default=BUDGET_MS)
+    options = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    failed = False
+    projects = files = 0
+    for config in matrix():
+        count, errors = check(config)
+        projects += 1
+        files += count
+        for error in errors:
+            print(f'ERROR {config.project_name}: {error}')
+            failed = True
+    elapsed = (time.perf_counter() - start) * 1000
+    print(f'{projects} proyectos, {files} archivos en {elapsed:.1f} ms (presupuesto: {options.budget_ms:.1f} ms)')
+    if elapsed > options.budget_ms:
+        print(f'ERROR: la matriz ({elapsed:.1f} ms) supera el presupuesto ({options.budget_ms:.1f} ms)')
+        failed = True
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,118 @@
+import os
+import re
+import marshal
+import hashlib
+from functools import lru_cache
+from importlib.util import MAGIC_NUMBER
+from src.files import cache_dir, atomic_write
+
+# Motor de plantillas mínimo para los archivos generados. Cada plantilla se
+# traduce una vez a código Python, se compila y el code object se guarda con
+# marshal en la caché; mientras el archivo no cambie (mtime y tamaño) las
+# siguientes ejecuciones cargan el bytecode sin volver a parsear.
+#
+#   <%= expr %>                       inserta str(expr)
+#   <% if expr %> / elif / else / endif
+#   <% for name in expr %> / endfor
+#   <% include "fragments/x.tmpl" %>  renderiza otra plantilla con el mismo contexto
+#
+# Una línea que solo contiene una etiqueta <% ... %> desaparece de la salida.
+
+TEMPLATES_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DIR = cache_dir('templates')
+ENGINE_VERSION = 1
+
+TAG = re.compile(r'<%(=?)\s*(.*?)\s*%>', re.S)
+# Etiqueta de control sola en su línea: se elimina la línea completa
+LINE_TAG = re.compile(r'^[ \t]*(<%[^=].*?%>)[ \t]*\n', re.M)
+
+class TemplateError(Exception):
+    pass
+
+def _compile_source(source:str, name:str):
+    source = LINE_TAG.sub(r'\1', source)
+    lines = []
+    depth = 0
+    stack = []
+    position = 0
+
+    def emit(code:str):
+        lines.append('    ' * depth + code)
+
+    for match in TAG.finditer(source):
+        if match.start() > position:
+            emit(f'_w({source[position:match.start()]!r})')
+        position = match.end()
+        expression, statement = match.group(1), match.group(2)
+        if expression:
+            emit(f'_w(_str({statement}))')
+            continue
+        keyword = statement.split(None, 1)[0] if statement else ''
+        if keyword in ('if', 'for'):
+            emit(f'{statement}:')
+            stack.append(keyword)
+            depth += 1
+        elif keyword in ('elif', 'else'):
+            if not stack or stack[-1] != 'if':
+                raise TemplateError(f'{name}: "{keyword}" sin "if"')
+            depth -= 1
+            emit(f'{statement}:')
+            depth += 1
+        elif keyword in ('endif', 'endfor'):
+            if not stack or stack.pop() != keyword[3:]:
+                raise TemplateError(f'{name}: "{keyword}" inesperado')
+            emit('pass')
+            depth -= 1
+        elif keyword == 'include':
+            emit(f'_w(_include({statement.split(None, 1)[1]}))')
+        else:
+            raise TemplateError(f'{name}: etiqueta desconocida "{statement}"')
+    if stack:
+        raise TemplateError(f'{name}: falta "end{stack[-1]}"')
+    if position < len(source):
+        emit(f'_w({source[position:]!r})')
+    return compile('\n'.join(lines) or 'pass', f'<template {name}>', 'exec')
+
+def _cache_path(path:str):
+    return os.path.join(CACHE_DIR, hashlib.sha256(path.encode()).hexdigest()[:24] + '.bin')
+
+def _load_bytecode(cache:str, stat):
+    try:
+        with open(cache, 'rb') as file:
+            magic, version, mtime, size, code = marshal.load(file)
+    except (OSError, EOFError, ValueError, TypeError):
+        return None
+    if (magic, version, mtime, size) != (MAGIC_NUMBER, ENGINE_VERSION, stat.st_mtime_ns, stat.st_size):
+        return None
+    return code
+
+def _save_bytecode(cache:str, stat, code):
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        atomic_write(cache, marshal.dumps((MAGIC_NUMBER, ENGINE_VERSION, stat.st_mtime_ns, stat.st_size, code)))
+    except OSError:
+        pass
+
+@lru_cache(maxsize=None)
+def get_template(name:str):
+    path = os.path.join(TEMPLATES_DIR, name)
+    stat = os.stat(path)
+    cache = _cache_path(path)
+    code = _load_bytecode(cache, stat)
+    if code is None:
+        with open(path, 'r', encoding='utf-8') as file:
+            code = _compile_source(file.read(), name)
+        _save_bytecode(cache, stat, code)
+    return code
+
+def render(name:str, **context):
+    out = []
+    namespace = {
+        '__builtins__': {},
+        '_w': out.append,
+        '_str': str,
+        '_include': lambda include: render(include, **context),
+        **context,
+    }
+    exec(get_template(name), namespace)
+    return ''.join(out)
@@ -1,6 +1,8 @@
 source fastapi_base/.venv/bin/activate
 cd fastapi_base
-pip install -r requirements.txt
-pip install "fastapi[standard]"
+# MCF_WHEELHOUSE: instalar desde wheels locales, sin red
+pip install ${MCF_WHEELHOUSE:+--no-index --find-links "$MCF_WHEELHOUSE"} -r requirements.txt
+pip install ${MCF_WHEELHOUSE:+--no-index --find-links "$MCF_WHEELHOUSE"} "fastapi[standard]"
 pip freeze > requirements.txt
+python -m app.migrate
 fastapi dev app/main.py
\ No newline at end of file